@@ -1,7 +1,7 @@
 import requests
 import json
 import random
-from typing import Optional, Dict, Any, List
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Callable
 from requests.exceptions import (
     RequestException, 
     Timeout, 
@@ -14,6 +14,14 @@ from requests.adapters import HTTPAdapter
 import bitso_auth
 from config_utils import ConfigUtils
 
+# The journal (and sqlite3) is only imported by clients that use one
+if TYPE_CHECKING:
+    from request_journal import RequestJournal
+
+class ApiError(ValueError):
+    """Error response ("success": false) returned by the API, i.e. the request was rejected"""
+
+
 class BitsoClient:
     """A client for making authenticated requests to Bitso API with built-in error handling and API key rotation"""
 
@@ -24,6 +32,7 @@ class BitsoClient:
         config_path: Optional[str] = None,
         timeout: int = 30,
         enable_key_rotation: bool = False,
+        journal: Optional["RequestJournal"] = None,
     ):
         """
         Initialize BitsoClient from configuration
@@ -34,6 +43,8 @@ class BitsoClient:
             config_path: Optional path to config file. If not provided, looks in same directory
             timeout: Request timeout in seconds
             enable_key_rotation: Whether to enable API key rotation for rate limiting
+            journal: Optional request journal used to make POST/PUT calls with an
+                idempotency key safe to retry and to recover after a crash
 
         Raises:
             FileNotFoundError: If config file is not found
@@ -42,6 +53,7 @@ class BitsoClient:
         Example:
             client = BitsoClient('prod', '234237')
             client_with_rotation = BitsoClient('prod', '234237', enable_key_rotation=True)
+            client_with_journal = BitsoClient('prod', '234237', journal=RequestJournal('prod_journal.db'))
         """
         config = ConfigUtils.load_config(config_path)
 
@@ -52,6 +64,7 @@ class BitsoClient:
             self._base_url = env_url.rstrip("/")  # Remove trailing slash if present
             self._timeout = timeout
             self._enable_key_rotation = enable_key_rotation
+            self._journal = journal
             
             # Create session for connection pooling and reuse
             self._session = requests.Session()
@@ -178,7 +191,8 @@ class BitsoClient:
             The payload data from successful response
             
         Raises:
-            ValueError: For API errors with specific error code and message
+            ApiError: For API errors with specific error code and message
+            ValueError: For responses that are not a valid API envelope
         """
         # Check if response has the expected structure
         if not isinstance(response_data, dict):
@@ -196,14 +210,19 @@ class BitsoClient:
             error_data = response_data.get("error", {})
             error_message = error_data.get("message", "Unknown error")
             error_code = error_data.get("code", "UNKNOWN")
-            raise ValueError(f"API Error {error_code}: {error_message}")
+            raise ApiError(f"API Error {error_code}: {error_message}")
         
         # Handle unexpected response structure
         else:
             raise ValueError(f"Unexpected response structure: {response_data}")
 
     def _make_request(
-        self, method: str, path: str, payload: Optional[Dict] = None, max_retries: int = 3
+        self,
+        method: str,
+        path: str,
+        payload: Optional[Dict] = None,
+        max_retries: int = 3,
+        retry_ambiguous: bool = True,
     ) -> Any:
         """
         Make an HTTP request with automatic error handling, response parsing, and key rotation
@@ -213,6 +232,9 @@ class BitsoClient:
             path: API endpoint path
             payload: Request payload for POST/PUT requests
             max_retries: Maximum number of retries with different keys
+            retry_ambiguous: Whether a request that may have executed (timeout, connection
+                error, unparseable response) is sent again. When False the error is raised at
+                once (a timeout as the original Timeout) so the caller can reconcile the outcome
 
         Returns:
             Parsed response data
@@ -250,6 +272,8 @@ class BitsoClient:
                 return self._handle_response(response_data)
 
             except Timeout:
+                if not retry_ambiguous:
+                    raise
                 last_exception = RequestException(f"Request timed out after {self._timeout} seconds")
             except ConnectionError as e:
                 last_exception = RequestException(f"Connection failed: {str(e)}")
@@ -265,6 +289,10 @@ class BitsoClient:
             except Exception as e:
                 print(f"Unexpected error: {e}")
                 last_exception = e
+
+            # Only an API error envelope proves the request was not executed
+            if not retry_ambiguous and not isinstance(last_exception, ApiError):
+                raise last_exception
             
             # If we have more attempts and key rotation is enabled, try with next key
             if attempt < max_retries - 1 and self._enable_key_rotation and len(self._api_keys) > 1:
@@ -274,14 +302,142 @@ class BitsoClient:
         # If we get here, all retries failed
         raise last_exception
 
+    def _reconcile(self, entry: Dict[str, Any], reconcile: Optional[Callable[[Dict[str, Any]], Any]]) -> Any:
+        """Look up whether a journaled request took effect, returning the resource or None"""
+        if reconcile is not None:
+            return reconcile(entry)
+        import request_journal
+        return request_journal.lookup_status(self, entry)
+
+    def _make_journaled_request(
+        self,
+        method: str,
+        path: str,
+        payload: Optional[Dict],
+        max_retries: int,
+        idempotency_key: str,
+        reconcile: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    ) -> Any:
+        """
+        Make a mutating request at most once per idempotency key
+
+        A completed key returns the journaled response without calling the API. A key
+        left pending/unknown (timeout, unparseable response or crash) is reconciled by
+        status lookup before anything is sent, and a timeout is reconciled instead of
+        blindly retried. Only API error envelopes mark the request as failed.
+
+        Raises:
+            RequestException: If the request fails or its outcome cannot be determined
+            TimeoutError: If the key stays claimed by another caller
+            ApiError: For API errors with specific error code and message
+        """
+        import request_journal
+
+        # Claiming the key serializes callers across threads and processes; a caller
+        # that waited for the claim then sees (and returns) the winner's outcome
+        with self._journal.claim(idempotency_key):
+            entry = self._journal.get(idempotency_key)
+            if entry is not None:
+                if entry["state"] == request_journal.COMPLETED:
+                    return entry["response"]
+
+                if entry["state"] in request_journal.UNRESOLVED_STATES:
+                    result = self._reconcile(entry, reconcile)
+                    if result is not None:
+                        self._journal.record_outcome(entry, request_journal.COMPLETED, response=result)
+                        return result
+                    if reconcile is None and not request_journal.has_status_lookup(entry):
+                        raise RequestException(
+                            f"Outcome of {method} {path} ({idempotency_key}) is {entry['state']} and cannot be looked up; "
+                            "pass a reconcile function or resolve it manually before retrying"
+                        )
+
+            self._journal.record_intent(idempotency_key, method, path, payload)
+            entry = self._journal.get(idempotency_key)
+
+            try:
+                result = self._make_request(method, path, payload, max_retries, retry_ambiguous=False)
+            except Timeout:
+                try:
+                    result = self._reconcile(entry, reconcile)
+                except (RequestException, ValueError) as e:
+                    print(f"Status lookup failed for {idempotency_key}: {e}")
+                    result = None
+                if result is not None:
+                    self._journal.record_outcome(entry, request_journal.COMPLETED, response=result)
+                    return result
+                self._journal.record_outcome(entry, request_journal.UNKNOWN, error="timeout")
+                raise RequestException(
+                    f"Request timed out after {self._timeout} seconds and no executed {method} {path} "
+                    f"was found for {idempotency_key}"
+                )
+            except ApiError as e:
+                # The API answered with an error envelope, so the request was not executed
+                self._journal.record_outcome(entry, request_journal.FAILED, error=str(e))
+                raise
+            except Exception as e:
+                # Includes non-JSON bodies (e.g. a gateway 502/504 page): the request may have run
+                self._journal.record_outcome(entry, request_journal.UNKNOWN, error=str(e))
+                raise
+
+            self._journal.record_outcome(entry, request_journal.COMPLETED, response=result)
+            return result
+
+    def recover_journal(self, reconcile: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Dict[str, str]:
+        """
+        Resolve every journaled request left pending/unknown by a previous run
+
+        Requests found by status lookup are marked completed; requests that never
+        took effect are sent again under the same idempotency key.
+
+        Args:
+            reconcile: Optional status lookup taking a journal entry. Defaults to
+                request_journal.lookup_status
+
+        Returns:
+            dict: Final state for each recovered idempotency key
+        """
+        if self._journal is None:
+            raise ValueError("Journal recovery requires a client created with journal=RequestJournal(...)")
+
+        states = {}
+        for entry in self._journal.unresolved():
+            key = entry["idempotency_key"]
+            try:
+                self._make_journaled_request(
+                    entry["method"], entry["path"], entry["payload"], 1, key, reconcile
+                )
+            except (RequestException, ValueError) as e:
+                print(f"Recovery failed for {key}: {e}")
+            states[key] = self._journal.get(key)["state"]
+        return states
+
     def get(self, path: str, max_retries: int = 1) -> Any:
         """Make a GET request with automatic response parsing and error handling"""
         return self._make_request("GET", path, max_retries=max_retries)
 
-    def post(self, path: str, payload: Dict[str, Any], max_retries: int = 1) -> Any:
-        """Make a POST request with automatic response parsing and error handling"""
+    def post(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        max_retries: int = 1,
+        idempotency_key: Optional[str] = None,
+        reconcile: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    ) -> Any:
+        """Make a POST request with automatic response parsing and error handling, journaled when idempotency_key is given"""
+        if self._journal is not None and idempotency_key:
+            return self._make_journaled_request("POST", path, payload, max_retries, idempotency_key, reconcile)
         return self._make_request("POST", path, payload, max_retries)
 
-    def put(self, path: str, payload: Optional[Dict[str, Any]] = None, max_retries: int = 1) -> Any:
-        """Make a PUT request with automatic response parsing and error handling"""
+    def put(
+        self,
+        path: str,
+        payload: Optional[Dict[str, Any]] = None,
+        max_retries: int = 1,
+        idempotency_key: Optional[str] = None,
+        reconcile: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    ) -> Any:
+        """Make a PUT request with automatic response parsing and error handling, journaled when idempotency_key is given"""
+        if self._journal is not None and idempotency_key:
+            return self._make_journaled_request("PUT", path, payload, max_retries, idempotency_key, reconcile)
         return self._make_request("PUT", path, payload, max_retries)
@@ -0,0 +1,340 @@
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+# Command line entry point. Every command is run as one or more jobs on a thread pool
+# and each result is written to stdout as a JSON line as soon as it completes.
+#
+# Examples:
+#   python cli.py --env stage --user-id 28 balances
+#   python cli.py --env stage --user-id 28 --concurrency 15 --repeat 2000 load-test
+#   python cli.py --env stage --user-id 28 --concurrency 5 --rate 2 --input conversions.jsonl convert
+#
+# Each line of an --input file is a JSON object of command arguments, optionally with
+# a "command" key, e.g. {"command": "quote", "from_amount": "50", "from_currency": "mxn", "to_currency": "btc"}
+
+
+def _terms(client, jurisdictions=None, include_text="0", markdown="0"):
+    import internal.internal_api as internal_api
+    return internal_api.get_terms(client, _split(jurisdictions), include_text, markdown)
+
+
+def _accept_terms(client, jurisdictions, include_text="0", markdown="0", agree=False, password=None, idempotency_key=None):
+    from internal.onboarding import Onboarding
+    return Onboarding.accept_terms(
+        client, _split(jurisdictions), include_text, markdown, agree, password, idempotency_key
+    )
+
+
+def _quote(client, from_currency, to_currency, from_amount=None, to_amount=None):
+    import internal.conversions_api as conversions
+    return conversions.create_quote(client, from_amount, to_amount, from_currency, to_currency)
+
+
+def _execute_conversion(client, quote_id):
+    import internal.conversions_api as conversions
+    return conversions.execute_conversion(client, quote_id)
+
+
+def _convert(client, from_currency, to_currency, from_amount=None, to_amount=None):
+    import internal.conversions_api as conversions
+    quote = conversions.create_quote(client, from_amount, to_amount, from_currency, to_currency)
+    return conversions.execute_conversion(client, quote["id"])
+
+
+def _conversion_quote(client, from_currency, to_currency, from_amount=None, to_amount=None, simple_path=False):
+    import internal.internal_api as internal_api
+    return internal_api.get_conversion_quote(client, from_amount, to_amount, from_currency, to_currency, simple_path)
+
+
+def _balances(client):
+    import internal.internal_api as internal_api
+    return internal_api.get_combined_balance(client)
+
+
+def _withdrawal_methods(client, currency=None):
+    import internal.internal_api as internal_api
+    return internal_api.get_withdrawal_methods(client, currency)
+
+
+def _account_status(client):
+    return client.get("/api/v3/account_status")
+
+
+def _catalogues(client):
+    import public.public_api as public_api
+    return public_api.get_catalogues(client)
+
+
+def _order(client, book, side, type, major="", minor="", price="", origin_id=""):
+    import public.public_api as public_api
+    return public_api.create_order(client, book, side, type, major, minor, rate=price, origin_id=origin_id)
+
+
+def _split(values: Optional[Any]) -> Optional[List[str]]:
+    """Accept jurisdictions as 'MX,CO' (command line) or ["MX", "CO"] (input files)"""
+    if not values:
+        return None
+    if isinstance(values, str):
+        return [value.strip() for value in values.split(",") if value.strip()]
+    return list(values)
+
+
+_CONVERSION_ARGUMENTS = [
+    ("from_currency", {"help": "Currency to spend (e.g. mxn)"}),
+    ("to_currency", {"help": "Currency to receive (e.g. btc)"}),
+    ("from_amount", {"help": "Amount to spend (exclusive with --to-amount)"}),
+    ("to_amount", {"help": "Amount to receive (exclusive with --from-amount)"}),
+]
+
+_TERMS_ARGUMENTS = [
+    ("jurisdictions", {"help": "Comma separated jurisdiction codes (e.g. MX,CO)"}),
+    ("include_text", {"default": "0", "help": "Include full text ('0' or '1')"}),
+    ("markdown", {"default": "0", "help": "Return text as markdown ('0' or '1')"}),
+]
+
+# name -> (handler, help, [(argument, argparse options)])
+COMMANDS: Dict[str, Tuple[Callable, str, List[Tuple[str, Dict[str, Any]]]]] = {
+    "terms": (_terms, "Get terms and conditions", _TERMS_ARGUMENTS),
+    "accept-terms": (_accept_terms, "Accept terms and conditions", _TERMS_ARGUMENTS + [
+        ("agree", {"action": "store_true", "help": "Agree to the terms"}),
+        ("password", {"help": "Optional password confirmation"}),
+        ("idempotency_key", {"help": "Journal the call under this key (requires --journal)"}),
+    ]),
+    "quote": (_quote, "Request a v4 conversion quote", _CONVERSION_ARGUMENTS),
+    "execute-conversion": (_execute_conversion, "Execute a v4 conversion quote", [
+        ("quote_id", {"help": "Quote id returned by the quote command"}),
+    ]),
+    "convert": (_convert, "Request and execute a v4 conversion", _CONVERSION_ARGUMENTS),
+    "conversion-quote": (_conversion_quote, "Get a v3 conversion quote", _CONVERSION_ARGUMENTS + [
+        ("simple_path", {"action": "store_true", "help": "Use /v3 instead of /api/v3"}),
+    ]),
+    "balances": (_balances, "Get the combined balance", []),
+    "withdrawal-methods": (_withdrawal_methods, "Get withdrawal methods", [
+        ("currency", {"help": "Optional currency filter"}),
+    ]),
+    "account-status": (_account_status, "Get the account status", []),
+    "catalogues": (_catalogues, "Get the catalogues", []),
+    "order": (_order, "Place an order", [
+        ("book", {"help": "Order book (e.g. btc_mxn)"}),
+        ("side", {"help": "buy or sell"}),
+        ("type", {"help": "market or limit"}),
+        ("major", {"default": "", "help": "Major amount"}),
+        ("minor", {"default": "", "help": "Minor amount"}),
+        ("price", {"default": "", "help": "Limit price"}),
+        ("origin_id", {"default": "", "help": "Client order id (defaults to a random id)"}),
+    ]),
+    "load-test": (_terms, "Load test the terms endpoint (defaults to --repeat 2000 --concurrency 15)", _TERMS_ARGUMENTS),
+}
+
+LOAD_TEST_DEFAULTS = {"repeat": 2000, "concurrency": 15}
+
+
+class RateLimiter:
+    """Spaces calls evenly so that at most `rate` start per second across all threads"""
+
+    def __init__(self, rate: Optional[float]):
+        self._interval = 1.0 / rate if rate else 0.0
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser with one sub-command per supported operation"""
+    parser = argparse.ArgumentParser(description="Bitso API command line client")
+    parser.add_argument("--env", required=True, help="Environment name from config.json (e.g. stage)")
+    parser.add_argument("--user-id", required=True, help="User ID or level from config.json credentials")
+    parser.add_argument("--config", help="Path to config file (defaults to config.json next to the client)")
+    parser.add_argument("--timeout", type=int, default=30, help="Request timeout in seconds")
+    parser.add_argument("--key-rotation", action="store_true", help="Enable API key rotation")
+    parser.add_argument("--journal", help="Request journal database for idempotent orders/conversions")
+    parser.add_argument("--concurrency", type=int, help="Number of requests executed in parallel (default 1)")
+    parser.add_argument("--rate", type=float, help="Maximum requests started per second")
+    parser.add_argument("--repeat", type=int, help="Run each request this many times (default 1)")
+    parser.add_argument("--input", help="File of JSON lines with one request each ('-' for stdin)")
+
+    subparsers = parser.add_subparsers(dest="command")
+    for name, (_, help_text, arguments) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text)
+        for argument, options in arguments:
+            subparser.add_argument("--" + argument.replace("_", "-"), dest=argument, **options)
+    return parser
+
+
+def _validate(command: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Check a request against its command's argument list"""
+    if command not in COMMANDS:
+        raise ValueError(f"Unknown command '{command}'")
+    allowed = {argument for argument, _ in COMMANDS[command][2]}
+    unknown = set(arguments) - allowed
+    if unknown:
+        raise ValueError(f"Unknown arguments for {command}: {', '.join(sorted(unknown))}")
+    return {key: value for key, value in arguments.items() if value is not None}
+
+
+def iter_requests(
+    args: argparse.Namespace, input_file: Optional[TextIO] = None
+) -> Iterator[Tuple[Optional[str], Dict[str, Any], Optional[str]]]:
+    """
+    Yield (command, arguments, error) triples to execute, reading the input file lazily
+
+    Arguments given on the command line act as defaults for every input line. A line
+    that cannot be parsed is yielded once with its error instead of aborting the run.
+    """
+    defaults = {}
+    if args.command:
+        defaults = {argument: getattr(args, argument) for argument, _ in COMMANDS[args.command][2]}
+
+    if input_file is None:
+        requests = iter([(args.command, defaults, None)])
+    else:
+        requests = (_parse_line(line, args.command, defaults) for line in input_file if line.strip())
+
+    for command, arguments, error in requests:
+        for _ in range(1 if error else args.repeat):
+            yield command, arguments, error
+
+
+def _parse_line(
+    line: str, default_command: Optional[str], defaults: Dict[str, Any]
+) -> Tuple[Optional[str], Dict[str, Any], Optional[str]]:
+    try:
+        request = json.loads(line)
+    except json.JSONDecodeError as e:
+        return default_command, {}, f"Invalid input line {line.strip()!r}: {e}"
+    if not isinstance(request, dict):
+        return default_command, {}, f"Invalid input line {line.strip()!r}: expected a JSON object"
+    command = request.pop("command", default_command)
+    if command != default_command:
+        defaults = {}
+    return command, {**defaults, **request}, None
+
+
+def _run_one(
+    client, limiter: RateLimiter, index: int, command: Optional[str], arguments: Dict[str, Any], error: Optional[str] = None
+) -> Dict[str, Any]:
+    """Execute a single request, returning its result line instead of raising"""
+    record: Dict[str, Any] = {"index": index, "command": command}
+    if error:
+        record.update({"success": False, "error": error, "elapsed_ms": 0.0})
+        return record
+
+    limiter.wait()
+    start = time.perf_counter()
+    try:
+        arguments = _validate(command, arguments)
+        result = COMMANDS[command][0](client, **arguments)
+        record.update({"success": True, "result": result})
+    except Exception as e:
+        record.update({"success": False, "error": str(e)})
+    record["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return record
+
+
+def run(client, args: argparse.Namespace, output: TextIO = sys.stdout, input_file: Optional[TextIO] = None) -> Dict[str, Any]:
+    """
+    Execute all requests with bounded parallelism, streaming each result as a JSON line
+
+    Returns:
+        dict: Summary with total, successful and failed counts and throughput
+    """
+    limiter = RateLimiter(args.rate)
+    requests = enumerate(iter_requests(args, input_file))
+    max_in_flight = args.concurrency * 2
+    total = successful = 0
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="cli_worker") as executor:
+        in_flight = set()
+        exhausted = False
+        while in_flight or not exhausted:
+            # Keep the queue short so huge input files are never loaded in memory
+            while not exhausted and len(in_flight) < max_in_flight:
+                try:
+                    index, (command, arguments, error) = next(requests)
+                except StopIteration:
+                    exhausted = True
+                    break
+                in_flight.add(executor.submit(_run_one, client, limiter, index, command, arguments, error))
+
+            if not in_flight:
+                break
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                record = future.result()
+                total += 1
+                successful += record["success"]
+                output.write(json.dumps(record, default=str) + "\n")
+            output.flush()
+
+    duration = time.perf_counter() - start
+    return {
+        "total": total,
+        "successful": successful,
+        "failed": total - successful,
+        "duration_seconds": round(duration, 3),
+        "requests_per_second": round(total / duration, 2) if duration else 0.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse arguments, run the requested jobs and print a summary to stderr"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if not args.command and not args.input:
+        parser.error("a command or --input file is required")
+    if args.command == "load-test":
+        for option, value in LOAD_TEST_DEFAULTS.items():
+            if getattr(args, option) is None:
+                setattr(args, option, value)
+    args.concurrency = args.concurrency or 1
+    args.repeat = args.repeat or 1
+    if args.concurrency < 1 or args.repeat < 1:
+        parser.error("--concurrency and --repeat must be at least 1")
+    if args.rate is not None and args.rate <= 0:
+        parser.error("--rate must be positive")
+
+    from bitso_client import BitsoClient
+    journal = None
+    if args.journal:
+        from request_journal import RequestJournal
+        journal = RequestJournal(args.journal)
+
+    client = BitsoClient(
+        env=args.env,
+        user_id=args.user_id,
+        config_path=args.config,
+        timeout=args.timeout,
+        enable_key_rotation=args.key_rotation,
+        journal=journal,
+    )
+
+    if args.input == "-":
+        summary = run(client, args, input_file=sys.stdin)
+    elif args.input:
+        with open(args.input, "r") as input_file:
+            summary = run(client, args, input_file=input_file)
+    else:
+        summary = run(client, args)
+
+    print(json.dumps({"summary": summary}), file=sys.stderr)
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
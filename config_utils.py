@@ -1,18 +1,37 @@
 import json
+import marshal
 import os
-from typing import Dict, Optional
+import threading
+from typing import Dict, Optional, Tuple
 
 
 class ConfigUtils:
     """Utility class for managing configuration files"""
 
+    # Parsed configs keyed by absolute path, so each process reads and parses a file once
+    _cache: Dict[str, Tuple[Tuple[int, int], Dict]] = {}
+    _cache_lock = threading.Lock()
+
+    @staticmethod
+    def _default_path() -> str:
+        return os.path.join(os.path.dirname(__file__), "config.json")
+
     @staticmethod
-    def load_config(config_path: Optional[str] = None) -> Dict:
+    def _compiled_path(config_path: str) -> str:
+        return config_path + ".marshal"
+
+    @staticmethod
+    def load_config(config_path: Optional[str] = None, use_cache: bool = True) -> Dict:
         """
         Load configuration from config.json file
 
+        The parsed config is cached per process and reused until the file changes.
+        If a precompiled copy (see precompile_config) is newer than the JSON file it
+        is loaded instead of parsing JSON. The returned dict is shared; do not mutate it.
+
         Args:
             config_path: Optional path to config file. If not provided, looks in same directory
+            use_cache: Whether to reuse the per-process parsed config
 
         Returns:
             Dict: Configuration data
@@ -21,12 +40,67 @@ class ConfigUtils:
             FileNotFoundError: If config.json is not found
         """
         if config_path is None:
-            config_path = os.path.join(os.path.dirname(__file__), "config.json")
+            config_path = ConfigUtils._default_path()
+        config_path = os.path.abspath(config_path)
 
-        if not os.path.exists(config_path):
+        try:
+            stat = os.stat(config_path)
+        except FileNotFoundError:
             raise FileNotFoundError(
                 "config.json not found. Please copy config.template.json to config.json and fill in your credentials."
             )
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        if use_cache:
+            cached = ConfigUtils._cache.get(config_path)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+
+        config = ConfigUtils._read_config(config_path, stat.st_mtime_ns)
+
+        if use_cache:
+            with ConfigUtils._cache_lock:
+                ConfigUtils._cache[config_path] = (version, config)
+        return config
+
+    @staticmethod
+    def _read_config(config_path: str, mtime_ns: int) -> Dict:
+        """Read the precompiled config when it is up to date, otherwise parse the JSON file"""
+        compiled_path = ConfigUtils._compiled_path(config_path)
+        try:
+            if os.stat(compiled_path).st_mtime_ns >= mtime_ns:
+                with open(compiled_path, "rb") as f:
+                    return marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
 
         with open(config_path, "r") as f:
             return json.load(f)
+
+    @staticmethod
+    def precompile_config(config_path: Optional[str] = None) -> str:
+        """
+        Write a marshal-encoded copy of the config next to it for faster cold starts
+
+        Args:
+            config_path: Optional path to config file. If not provided, looks in same directory
+
+        Returns:
+            str: Path of the precompiled file (contains credentials, keep it private)
+        """
+        if config_path is None:
+            config_path = ConfigUtils._default_path()
+        config_path = os.path.abspath(config_path)
+
+        with open(config_path, "r") as f:
+            config = json.load(f)
+
+        compiled_path = ConfigUtils._compiled_path(config_path)
+        fd = os.open(compiled_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            marshal.dump(config, f)
+        return compiled_path
+
+
+if __name__ == "__main__":
+    print(f"Precompiled config written to {ConfigUtils.precompile_config()}")
@@ -0,0 +1,331 @@
+import csv
+from decimal import Decimal, InvalidOperation, localcontext
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from bitso_client import BitsoClient
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pa_ipc = None
+    pq = None
+
+# Util module to stream API results into columnar / tabular files
+
+SUPPORTED_FORMATS = ("csv", "arrow", "parquet")
+
+
+def iter_paginated(
+    client: BitsoClient,
+    path: str,
+    limit: int = 100,
+    marker_field: str = "id",
+    max_pages: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield records one by one from a marker-paginated list endpoint
+
+    Args:
+        client: BitsoClient instance
+        path: API endpoint path (may already contain query parameters)
+        limit: Page size requested from the API
+        marker_field: Record field used as the marker for the next page
+        max_pages: Optional cap on the number of pages fetched
+
+    Yields:
+        dict: Each record of every page, in API order
+    """
+    separator = "&" if "?" in path else "?"
+    marker = None
+    pages = 0
+
+    while max_pages is None or pages < max_pages:
+        request_path = f"{path}{separator}limit={limit}"
+        if marker is not None:
+            request_path = f"{request_path}&marker={marker}"
+
+        page = client.get(request_path)
+        pages += 1
+        if not page:
+            return
+
+        yield from page
+
+        if len(page) < limit:
+            return
+        marker = page[-1].get(marker_field)
+        if marker is None:
+            return
+
+
+def flatten_record(record: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """Flatten nested dicts into dotted column names (e.g. 'fees.amount')"""
+    flat: Dict[str, Any] = {}
+    for key, value in record.items():
+        column = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_record(value, f"{column}."))
+        else:
+            flat[column] = value
+    return flat
+
+
+class RecordExporter:
+    """Streams API records to CSV, Arrow IPC or Parquet in fixed-size record batches"""
+
+    def __init__(
+        self,
+        path: str,
+        fmt: str = "csv",
+        batch_size: int = 10000,
+        decimal_fields: Optional[Iterable[str]] = None,
+        decimal_precision: int = 38,
+        decimal_scale: int = 18,
+        fields: Optional[List[str]] = None,
+        column_types: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Initialize RecordExporter
+
+        Only one batch of records is held in memory at any time, so memory
+        stays flat regardless of how many records are exported.
+
+        Args:
+            path: Output file path
+            fmt: Output format ('csv', 'arrow' or 'parquet')
+            batch_size: Number of records buffered per written batch
+            decimal_fields: Columns written as fixed-point decimals (amounts, rates, fees)
+            decimal_precision: Total digits for decimal columns
+            decimal_scale: Digits after the decimal point for decimal columns
+            fields: Optional explicit column order; other columns are not exported. If not
+                provided, the columns of the first batch are used and a later batch with
+                columns not seen before raises ValueError
+            column_types: Optional pyarrow types per column (e.g. {'id': pa.string()}).
+                Other columns take the type inferred from the first batch; a later value
+                that cannot be converted to it without loss raises ValueError
+
+        If no record is written, the file still gets a header (CSV) or schema
+        (Arrow/Parquet) when fields or column_types are given; otherwise no file is created.
+
+        Raises:
+            ValueError: If the format is not supported or batch_size is invalid
+            ImportError: If an Arrow/Parquet format is requested without pyarrow installed
+
+        Example:
+            with RecordExporter('trades.parquet', 'parquet', decimal_fields=['price', 'major']) as exporter:
+                exporter.write_all(iter_paginated(client, '/api/v3/user_trades'))
+        """
+        if fmt not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported export format '{fmt}'. Use one of {SUPPORTED_FORMATS}")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if fmt != "csv" and pa is None:
+            raise ImportError(f"pyarrow is required to export '{fmt}' files. Install it with 'pip install pyarrow'")
+
+        self._path = path
+        self._fmt = fmt
+        self._batch_size = batch_size
+        self._decimal_fields = set(decimal_fields or [])
+        self._decimal_precision = decimal_precision
+        self._quantum = Decimal(1).scaleb(-decimal_scale)
+        self._decimal_scale = decimal_scale
+        self._fields = list(fields) if fields else None
+        self._explicit_fields = self._fields is not None
+        self._column_types = dict(column_types or {})
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._writer = None
+        self._file = None
+        self._schema = None
+        self._records_written = 0
+
+    @property
+    def records_written(self) -> int:
+        """Number of records flushed to the output file so far"""
+        return self._records_written
+
+    def write(self, record: Dict[str, Any]):
+        """Buffer a single record, flushing a batch once batch_size is reached"""
+        self._buffer.append(flatten_record(record))
+        if len(self._buffer) >= self._batch_size:
+            self.flush()
+
+    def write_all(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Consume an iterable/generator of records and return the total written"""
+        for record in records:
+            self.write(record)
+        self.flush()
+        return self._records_written
+
+    def flush(self):
+        """Write the buffered records as one batch"""
+        if not self._buffer:
+            return
+
+        if self._fields is None:
+            self._fields = list(self._buffer[0].keys())
+            for record in self._buffer[1:]:
+                for column in record:
+                    if column not in self._fields:
+                        self._fields.append(column)
+        elif not self._explicit_fields:
+            # Optional fields (e.g. 'price' on market orders) may first appear in a later batch
+            unseen = list(dict.fromkeys(
+                column for record in self._buffer for column in record if column not in self._fields
+            ))
+            if unseen:
+                raise ValueError(
+                    f"Columns {unseen} were not in the first batch and would be dropped; "
+                    f"pass fields=[...] with every column to export"
+                )
+
+        if self._fmt == "csv":
+            self._write_csv_batch(self._buffer)
+        else:
+            self._write_arrow_batch(self._buffer)
+
+        self._records_written += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        """Flush pending records and close the underlying writer"""
+        self.flush()
+        if self._writer is None and self._records_written == 0:
+            # Nothing was written: still create the file when its columns are known
+            self._fields = self._fields or list(self._column_types) or None
+            if self._fields is not None:
+                if self._fmt == "csv":
+                    self._write_csv_batch([])
+                else:
+                    self._write_arrow_batch([])
+        if self._writer is not None and self._fmt != "csv":
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+        self._writer = None
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            # Don't retry writing the batch that just failed
+            self._buffer = []
+        self.close()
+
+    def _to_decimal(self, value: Any) -> Optional[Decimal]:
+        """Convert an API amount (usually a string) to a quantized Decimal"""
+        if value is None or value == "":
+            return None
+        try:
+            # The default context only keeps 28 digits; decimal columns may hold more
+            with localcontext() as context:
+                context.prec = self._decimal_precision
+                return Decimal(str(value)).quantize(self._quantum)
+        except InvalidOperation:
+            raise ValueError(f"Value '{value}' cannot be exported as decimal({self._decimal_precision}, {self._decimal_scale})")
+
+    def _write_csv_batch(self, batch: List[Dict[str, Any]]):
+        if self._writer is None:
+            self._file = open(self._path, "w", newline="")
+            self._writer = csv.DictWriter(self._file, fieldnames=self._fields, extrasaction="ignore")
+            self._writer.writeheader()
+
+        for record in batch:
+            row = dict(record)
+            for column in self._decimal_fields.intersection(row):
+                row[column] = self._to_decimal(row[column])
+            self._writer.writerow(row)
+
+    def _write_arrow_batch(self, batch: List[Dict[str, Any]]):
+        columns = {column: [record.get(column) for record in batch] for column in self._fields}
+
+        if self._schema is None:
+            self._schema = self._infer_schema(columns)
+            if self._fmt == "parquet":
+                self._writer = pq.ParquetWriter(self._path, self._schema)
+            else:
+                self._file = pa.OSFile(self._path, "wb")
+                self._writer = pa_ipc.new_file(self._file, self._schema)
+        if not batch:
+            return
+
+        arrays = []
+        for field in self._schema:
+            values = columns[field.name]
+            if field.name in self._decimal_fields:
+                arrays.append(pa.array([self._to_decimal(value) for value in values], type=field.type))
+            elif pa.types.is_string(field.type):
+                arrays.append(pa.array([None if value is None else str(value) for value in values], type=field.type))
+            else:
+                arrays.append(self._to_typed_array(field, values))
+
+        self._writer.write_batch(pa.record_batch(arrays, schema=self._schema))
+
+    @staticmethod
+    def _to_typed_array(field, values: List[Any]):
+        """Build an array of the schema type, refusing lossy casts (e.g. 1.5 into int64)"""
+        try:
+            array = pa.array(values)
+            if array.type != field.type:
+                array = array.cast(field.type, safe=True)
+            return array
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+            raise ValueError(
+                f"Column '{field.name}' has values that do not fit its type {field.type}; "
+                f"pass column_types to set it explicitly: {e}"
+            )
+
+    def _infer_schema(self, columns: Dict[str, List[Any]]):
+        """Build the schema from the first batch and column_types; decimal columns use decimal128"""
+        decimal_type = pa.decimal128(self._decimal_precision, self._decimal_scale)
+        fields = []
+        for column, values in columns.items():
+            if column in self._decimal_fields:
+                fields.append(pa.field(column, decimal_type))
+                continue
+            if column in self._column_types:
+                fields.append(pa.field(column, self._column_types[column]))
+                continue
+            try:
+                inferred = pa.array(values).type
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                inferred = pa.string()
+            if pa.types.is_null(inferred) or pa.types.is_nested(inferred):
+                inferred = pa.string()
+            fields.append(pa.field(column, inferred))
+        return pa.schema(fields)
+
+
+def export_records(
+    records: Iterable[Dict[str, Any]],
+    path: str,
+    fmt: str = "csv",
+    batch_size: int = 10000,
+    decimal_fields: Optional[Iterable[str]] = None,
+    column_types: Optional[Dict[str, Any]] = None,
+    fields: Optional[List[str]] = None,
+) -> int:
+    """
+    Export records to a file in fixed-size batches
+
+    Args:
+        records: Iterable or generator of API records (e.g. from iter_paginated)
+        path: Output file path
+        fmt: Output format ('csv', 'arrow' or 'parquet')
+        batch_size: Number of records per written batch
+        decimal_fields: Columns written as fixed-point decimals
+        column_types: Optional pyarrow types per column for Arrow/Parquet output
+        fields: Optional explicit column order, required when some columns only appear
+            after the first batch
+
+    Returns:
+        int: Number of records written. When no record is written and column_types is
+        not given, no file is created
+    """
+    with RecordExporter(path, fmt, batch_size, decimal_fields, fields=fields, column_types=column_types) as exporter:
+        return exporter.write_all(records)
@@ -1,5 +1,6 @@
 import http_utils
 import json
+from bitso_client import BitsoClient
 
 def request_quote_v4(url, key, secret, from_amount, to_amount, source_currency, target_currency):
     request_path = "/api/v4/currency_conversions"
@@ -65,4 +66,43 @@ def execute_quote_v4(url, key, secret, quote_id):
             return None
     else:
         # print(f"Request failed with status code: {response.status_code}")
-        return None
\ No newline at end of file
+        return None
+
+def create_quote(client: BitsoClient, from_amount, to_amount, source_currency, target_currency):
+    """
+    Request a v4 conversion quote through the client
+
+    Returns:
+        dict: The quote payload (its 'id' is used by execute_conversion)
+
+    Raises:
+        ValueError: If both or neither of from_amount and to_amount are given, or for API errors
+    """
+    if bool(from_amount) == bool(to_amount):
+        raise ValueError("Exactly one of from_amount and to_amount must be provided")
+
+    request_path = "/api/v4/currency_conversions"
+    payload = {
+        'from_currency': source_currency,
+        'to_currency': target_currency
+    }
+
+    # Amounts may be strings or money.Amount; the API expects plain decimal strings
+    if from_amount:
+        payload['spend_amount'] = str(from_amount)
+
+    if to_amount:
+        payload['receive_amount'] = str(to_amount)
+
+    return client.post(request_path, payload)
+
+def execute_conversion(client: BitsoClient, quote_id):
+    """
+    Execute a v4 conversion quote through the client, journaled by quote id so a
+    timed out execution is reconciled by status lookup instead of executed twice
+
+    Returns:
+        dict: The payload data from successful response
+    """
+    request_path = "/api/v4/currency_conversions/" + quote_id
+    return client.put(request_path, idempotency_key=f"conversion:{quote_id}")
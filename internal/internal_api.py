@@ -1,7 +1,6 @@
 import http_utils
 from bitso_client import BitsoClient
 from typing import List, Optional
-from requests.exceptions import RequestException
 
 
 def conversion_quote(
@@ -67,6 +66,52 @@ def combined_balance(url, key, secret):
     print(response.content)
 
 
+def get_conversion_quote(
+    client: BitsoClient,
+    from_amount: str,
+    to_amount: str,
+    source_currency: str,
+    target_currency: str,
+    simple_path: bool = False,
+):
+    """
+    Get a v3 conversion quote through the client
+
+    Returns:
+        dict: The payload data from successful response
+
+    Raises:
+        ValueError: If both or neither of from_amount and to_amount are given, or for API errors
+    """
+    if bool(from_amount) == bool(to_amount):
+        raise ValueError("Exactly one of from_amount and to_amount must be provided")
+
+    request_path = "/v3/conversion_quote" if simple_path else "/api/v3/conversion_quote"
+
+    if from_amount:
+        request_path = f"{request_path}?from_amount={from_amount}"
+    else:
+        request_path = f"{request_path}?to_amount={to_amount}"
+
+    request_path = f"{request_path}&from_currency={source_currency}&to_currency={target_currency}"
+    return client.get(request_path)
+
+
+def get_withdrawal_methods(client: BitsoClient, currency: Optional[str] = None):
+    """Get the withdrawal methods, optionally for one currency, through the client"""
+    request_path = "/api/v3/withdrawal_methods"
+
+    if currency:
+        request_path = f"{request_path}/{currency}"
+
+    return client.get(request_path)
+
+
+def get_combined_balance(client: BitsoClient):
+    """Get the combined balance through the client"""
+    return client.get("/api/v3/combined_balance")
+
+
 def get_terms(
     client: BitsoClient,
     jurisdictions: Optional[List[str]] = None,
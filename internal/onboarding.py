@@ -1,17 +1,17 @@
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional
 from requests.exceptions import RequestException
 from bitso_client import BitsoClient
 import internal.internal_api as internal_api
-import time
-import threading
 import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 
 class Onboarding:
 
     @staticmethod
     def testing_terms_migration(client: BitsoClient):
+        # Imported here so callers that never run the load test don't pay for it
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
         num_threads = 15
         required_iterations = 2000  # Increased from 1200 to 2000
         
@@ -60,7 +60,8 @@ class Onboarding:
     @staticmethod
     def accept_terms(client: BitsoClient, jurisdictions: List[str], include_text: str = '0', 
                     markdown: str = '0', agree_to_terms: bool = False, 
-                    password: Optional[str] = None) -> dict:
+                    password: Optional[str] = None, idempotency_key: Optional[str] = None,
+                    reconcile: Optional[Callable[[Dict[str, Any]], Any]] = None) -> dict:
         """
         Accept terms and conditions for specified jurisdictions
         
@@ -71,6 +72,8 @@ class Onboarding:
             markdown: Whether to return text in markdown format ('0' or '1')
             agree_to_terms: Whether user agrees to terms (True/False)
             password: Optional password for confirmation
+            idempotency_key: Optional key to journal the call (requires a client with a journal)
+            reconcile: Optional status lookup used when a journaled call's outcome is unknown
         
         Returns:
             Dictionary containing acceptance response
@@ -101,8 +104,7 @@ class Onboarding:
             payload["password"] = password
 
         try:
-            response = client.post(request_path, payload)
-            return response.json()
+            return client.post(request_path, payload, idempotency_key=idempotency_key, reconcile=reconcile)
         except RequestException as e:
             print(f"Error accepting terms: {e}")
             raise
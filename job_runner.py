@@ -0,0 +1,526 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Union
+
+if TYPE_CHECKING:
+    from request_journal import RequestJournal
+
+# Sharded job runner: a work list is spooled into a SQLite queue and drained by
+# worker processes on this node, each using its own key sets. Task progress is
+# checkpointed in the queue, so a crashed worker's tasks are picked up again by
+# another worker after their lease expires.
+#
+# The queue and the request journal use SQLite in WAL mode, which needs shared memory
+# on a single host: keep both files on a local disk, never on NFS/SMB. Running on
+# several nodes needs a shared queue and journal passed to run_worker/run_local as
+# factories.
+#
+# Examples:
+#   python job_runner.py --queue jobs.db enqueue --job terms_mx --task terms --users stage
+#   python job_runner.py --queue jobs.db run --job terms_mx --env stage --user-ids 28,29,30 --workers 2
+#   python job_runner.py --queue jobs.db work --job terms_mx --env stage --user-id 31
+#   python job_runner.py --queue jobs.db summary --job terms_mx
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobQueue:
+    """
+    Durable task queue stored in a SQLite file on the local disk
+
+    This is the single-node stand-in for a shared queue: any object with the same
+    enqueue/claim/renew/checkpoint/complete/fail/summary/results/close methods can
+    replace it by passing a factory to run_worker/run_local.
+    """
+
+    def __init__(self, path: str = "jobs.db", lease_seconds: int = 300, max_attempts: int = 3):
+        """
+        Open (or create) a job queue
+
+        Args:
+            path: SQLite database file path on a local disk (shared by every worker on this node)
+            lease_seconds: Time after which a running task is considered abandoned
+            max_attempts: Attempts before a task failing with network errors is marked failed
+        """
+        self._path = path
+        self._lease_seconds = lease_seconds
+        self._max_attempts = max_attempts
+        self._connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job TEXT NOT NULL,
+                task TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                worker TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_expires REAL,
+                checkpoint TEXT,
+                result TEXT,
+                error TEXT,
+                elapsed REAL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS tasks_job_status ON tasks (job, status, id)")
+
+    def enqueue(self, job: str, task: str, payloads: Iterable[Dict[str, Any]]) -> int:
+        """Add one task per payload to a job, returning the number of tasks added"""
+        now = time.time()
+        rows = ((job, task, json.dumps(payload), QUEUED, now) for payload in payloads)
+        with self._connection:
+            self._connection.execute("BEGIN IMMEDIATE")
+            cursor = self._connection.executemany(
+                "INSERT INTO tasks (job, task, payload, status, updated_at) VALUES (?, ?, ?, ?, ?)", rows
+            )
+        return cursor.rowcount
+
+    def claim(self, job: str, worker: str) -> Optional[Dict[str, Any]]:
+        """Lease the next queued (or abandoned) task of a job, or None when nothing is left"""
+        now = time.time()
+        with self._connection:
+            self._connection.execute("BEGIN IMMEDIATE")
+            row = self._connection.execute(
+                """
+                SELECT * FROM tasks
+                WHERE job = ? AND (status = ? OR (status = ? AND lease_expires < ?))
+                ORDER BY id LIMIT 1
+                """,
+                (job, QUEUED, RUNNING, now),
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute(
+                """
+                UPDATE tasks SET status = ?, worker = ?, attempts = attempts + 1, lease_expires = ?, updated_at = ?
+                WHERE id = ?
+                """,
+                (RUNNING, worker, now + self._lease_seconds, now, row["id"]),
+            )
+
+        task = dict(row)
+        task["worker"] = worker
+        task["payload"] = json.loads(task["payload"])
+        task["checkpoint"] = json.loads(task["checkpoint"]) if task["checkpoint"] else {}
+        task["attempts"] += 1
+        return task
+
+    def renew(self, task: Dict[str, Any]) -> bool:
+        """
+        Extend a task's lease right before work starts
+
+        Returns:
+            bool: False if the lease already expired and another worker took the task
+        """
+        now = time.time()
+        cursor = self._connection.execute(
+            "UPDATE tasks SET lease_expires = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = ?",
+            (now + self._lease_seconds, now, task["id"], task["worker"], RUNNING),
+        )
+        return cursor.rowcount == 1
+
+    def checkpoint(self, task_id: int, state: Dict[str, Any]):
+        """Persist intermediate task state (e.g. a quote id) before a non-repeatable step"""
+        self._connection.execute(
+            "UPDATE tasks SET checkpoint = ?, updated_at = ? WHERE id = ?",
+            (json.dumps(state), time.time(), task_id),
+        )
+
+    def complete(self, task: Dict[str, Any], result: Any, elapsed: float) -> bool:
+        """
+        Mark a task as done with its result
+
+        Returns:
+            bool: False if the task's lease was lost to another worker (its result wins)
+        """
+        cursor = self._connection.execute(
+            """
+            UPDATE tasks SET status = ?, result = ?, error = NULL, elapsed = ?, lease_expires = NULL, updated_at = ?
+            WHERE id = ? AND worker = ? AND status = ?
+            """,
+            (DONE, json.dumps(result, default=str), elapsed, time.time(), task["id"], task["worker"], RUNNING),
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, task: Dict[str, Any], error: str, elapsed: float, retry: bool = False) -> bool:
+        """
+        Mark a task as failed, or put it back in the queue if it may be retried
+
+        Returns:
+            bool: False if the task's lease was lost to another worker
+        """
+        status = QUEUED if retry and task["attempts"] < self._max_attempts else FAILED
+        cursor = self._connection.execute(
+            """
+            UPDATE tasks SET status = ?, error = ?, elapsed = ?, lease_expires = NULL, updated_at = ?
+            WHERE id = ? AND worker = ? AND status = ?
+            """,
+            (status, error, elapsed, time.time(), task["id"], task["worker"], RUNNING),
+        )
+        return cursor.rowcount == 1
+
+    def summary(self, job: str) -> Dict[str, Any]:
+        """Aggregate task counts per status and per worker for a job"""
+        statuses = {
+            row["status"]: row["count"]
+            for row in self._connection.execute(
+                "SELECT status, COUNT(*) AS count FROM tasks WHERE job = ? GROUP BY status", (job,)
+            )
+        }
+        workers = {
+            row["worker"]: {"done": row["done"], "failed": row["failed"], "avg_elapsed": row["avg_elapsed"]}
+            for row in self._connection.execute(
+                """
+                SELECT worker,
+                       SUM(status = ?) AS done,
+                       SUM(status = ?) AS failed,
+                       AVG(CASE WHEN status = ? THEN elapsed END) AS avg_elapsed
+                FROM tasks WHERE job = ? AND worker IS NOT NULL GROUP BY worker
+                """,
+                (DONE, FAILED, DONE, job),
+            )
+        }
+        return {"job": job, "total": sum(statuses.values()), "statuses": statuses, "workers": workers}
+
+    def results(self, job: str, status: Optional[str] = None) -> Iterable[Dict[str, Any]]:
+        """Yield finished tasks of a job (optionally of one status) in enqueue order"""
+        query = "SELECT id, task, payload, status, worker, attempts, result, error, elapsed FROM tasks WHERE job = ?"
+        params: List[Any] = [job]
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        for row in self._connection.execute(query + " ORDER BY id", params):
+            task = dict(row)
+            task["payload"] = json.loads(task["payload"])
+            task["result"] = json.loads(task["result"]) if task["result"] else None
+            yield task
+
+    def close(self):
+        """Close the underlying database connection"""
+        self._connection.close()
+
+
+def _terms_task(client, payload: Dict[str, Any], checkpoint: Callable[[Dict[str, Any]], None], state: Dict[str, Any]):
+    import internal.internal_api as internal_api
+    return internal_api.get_terms(client, payload.get("jurisdictions"))
+
+
+# Fields of a get_terms item that tell whether the user accepted it
+TERMS_ACCEPTANCE_FIELDS = ("accepted", "is_accepted", "accepted_at")
+
+
+def _terms_acceptance_lookup(client, jurisdictions: List[str]) -> Callable[[Dict[str, Any]], Any]:
+    """Reconcile an accept_terms call with get_terms: the terms if accepted, None if not"""
+    import internal.internal_api as internal_api
+
+    def reconcile(entry: Dict[str, Any]) -> Any:
+        terms = internal_api.get_terms(client, jurisdictions)
+        items = terms if isinstance(terms, list) else [terms]
+        flags = [
+            item[field] for item in items if isinstance(item, dict) for field in TERMS_ACCEPTANCE_FIELDS if field in item
+        ]
+        if not flags:
+            # Unknown is not 'not accepted': never let the caller send the POST again
+            raise ValueError(
+                f"get_terms does not report acceptance; resolve {entry['idempotency_key']} manually"
+            )
+        return terms if all(flags) else None
+
+    return reconcile
+
+
+def _accept_terms_task(client, payload: Dict[str, Any], checkpoint: Callable[[Dict[str, Any]], None], state: Dict[str, Any]):
+    from internal.onboarding import Onboarding
+
+    # Journaled so a timed out or 502'd acceptance is reconciled before it is retried
+    jurisdictions = payload["jurisdictions"]
+    return Onboarding.accept_terms(
+        client,
+        jurisdictions,
+        agree_to_terms=payload.get("agree_to_terms", False),
+        idempotency_key=f"accept_terms:{payload['user_id']}:{','.join(jurisdictions)}",
+        reconcile=_terms_acceptance_lookup(client, jurisdictions),
+    )
+
+
+def _conversion_task(client, payload: Dict[str, Any], checkpoint: Callable[[Dict[str, Any]], None], state: Dict[str, Any]):
+    import internal.conversions_api as conversions
+
+    # A retried task executes the quote it already requested instead of a new one
+    quote_id = state.get("quote_id")
+    if quote_id is None:
+        quote = conversions.create_quote(
+            client, payload.get("from_amount"), payload.get("to_amount"), payload["from_currency"], payload["to_currency"]
+        )
+        quote_id = quote["id"]
+        checkpoint({"quote_id": quote_id})
+    return conversions.execute_conversion(client, quote_id)
+
+
+def _balances_task(client, payload: Dict[str, Any], checkpoint: Callable[[Dict[str, Any]], None], state: Dict[str, Any]):
+    import internal.internal_api as internal_api
+    return internal_api.get_combined_balance(client)
+
+
+# task name -> handler(client, payload, checkpoint, state)
+TASKS: Dict[str, Callable] = {
+    "terms": _terms_task,
+    "accept_terms": _accept_terms_task,
+    "conversion": _conversion_task,
+    "balances": _balances_task,
+}
+
+
+def credential_user_ids(env: str, config_path: Optional[str] = None) -> List[str]:
+    """List the user ids configured under an environment's credentials"""
+    from config_utils import ConfigUtils
+    return list(ConfigUtils.load_config(config_path)["credentials"][env].keys())
+
+
+# A queue or journal is given as a local database path or as a zero-argument factory
+# (picklable, e.g. a module-level function, for run_local) opening a shared backend
+QueueSource = Union[str, Callable[[], JobQueue]]
+JournalSource = Union[str, Callable[[], "RequestJournal"]]
+
+
+def _open_queue(queue: QueueSource) -> JobQueue:
+    return JobQueue(queue) if isinstance(queue, str) else queue()
+
+
+def run_worker(
+    queue: QueueSource,
+    job: str,
+    env: str,
+    user_ids: List[str],
+    worker_name: Optional[str] = None,
+    config_path: Optional[str] = None,
+    rate: Optional[float] = None,
+    journal: Optional[JournalSource] = None,
+    enable_key_rotation: bool = False,
+) -> Dict[str, int]:
+    """
+    Drain a job's tasks, using this worker's key sets round-robin
+
+    Tasks whose payload has a 'user_id' run with that user's client instead, so a
+    work list of user ids runs each task as its user. Handlers always receive the
+    user id they run as in payload['user_id'].
+
+    Args:
+        queue: Job queue database path, or a factory opening a shared queue
+        job: Job name to work on
+        env: Environment name (e.g. 'stage')
+        user_ids: Credentials entries (key sets) assigned to this worker
+        worker_name: Name recorded on the tasks. Defaults to host:pid
+        config_path: Optional path to config file
+        rate: Optional maximum requests started per second per key set
+        journal: Request journal path or factory shared by all workers so conversions
+            and terms acceptances are never executed twice. Defaults to '<queue>.journal'
+            (required when queue is a factory)
+        enable_key_rotation: Whether to enable API key rotation
+
+    Returns:
+        dict: Number of tasks this worker completed and failed
+
+    Raises:
+        ValueError: If queue is a factory and no journal is given
+    """
+    from requests.exceptions import RequestException
+    from bitso_client import BitsoClient
+    from cli import RateLimiter
+    from request_journal import RequestJournal
+
+    if journal is None:
+        if not isinstance(queue, str):
+            raise ValueError("A journal (path or factory) shared by every worker is required with a queue factory")
+        journal = f"{queue}.journal"
+
+    worker_name = worker_name or f"{socket.gethostname()}:{os.getpid()}"
+    queue = _open_queue(queue)
+    # Always journaled: a retried conversion task must reconcile, never re-PUT blindly
+    journal = RequestJournal(journal) if isinstance(journal, str) else journal()
+    key_sets = itertools.cycle(user_ids)
+
+    clients: Dict[str, BitsoClient] = {}
+    limiters: Dict[str, RateLimiter] = {}
+
+    def client_for(task_user_id: str) -> BitsoClient:
+        if task_user_id not in clients:
+            clients[task_user_id] = BitsoClient(
+                env, task_user_id, config_path=config_path,
+                enable_key_rotation=enable_key_rotation, journal=journal,
+            )
+            limiters[task_user_id] = RateLimiter(rate)
+        return clients[task_user_id]
+
+    counts = {"done": 0, "failed": 0, "lost": 0}
+    while True:
+        task = queue.claim(job, worker_name)
+        if task is None:
+            break
+
+        start = time.perf_counter()
+        try:
+            handler = TASKS[task["task"]]
+            task_user_id = str(task["payload"].get("user_id") or next(key_sets))
+            client = client_for(task_user_id)
+            limiters[task_user_id].wait()
+            if not queue.renew(task):
+                print(f"Worker {worker_name} lost the lease on task {task['id']} while rate limited; skipping it")
+                counts["lost"] += 1
+                continue
+            result = handler(
+                client,
+                {**task["payload"], "user_id": task_user_id},
+                lambda state, task_id=task["id"]: queue.checkpoint(task_id, state),
+                task["checkpoint"],
+            )
+            recorded = queue.complete(task, result, time.perf_counter() - start)
+            outcome = "done"
+        except RequestException as e:
+            # Network errors are retried by any worker; API errors are final
+            recorded = queue.fail(task, str(e), time.perf_counter() - start, retry=True)
+            outcome = "failed"
+        except Exception as e:
+            recorded = queue.fail(task, str(e), time.perf_counter() - start)
+            outcome = "failed"
+
+        if not recorded:
+            print(f"Worker {worker_name} lost the lease on task {task['id']}; its outcome was not recorded")
+            outcome = "lost"
+        counts[outcome] += 1
+
+    queue.close()
+    journal.close()
+    print(f"Worker {worker_name} finished: {counts['done']} done, {counts['failed']} failed, {counts['lost']} lost")
+    return counts
+
+
+def run_local(
+    queue: QueueSource,
+    job: str,
+    env: str,
+    user_ids: List[str],
+    workers: Optional[int] = None,
+    config_path: Optional[str] = None,
+    rate: Optional[float] = None,
+    journal: Optional[JournalSource] = None,
+    enable_key_rotation: bool = False,
+) -> Dict[str, Any]:
+    """
+    Run worker processes on this node and return the job summary
+
+    Args:
+        queue: Job queue database path, or a picklable factory opening a shared queue
+        user_ids: Credentials entries (key sets), handed out to workers round-robin
+        workers: Number of worker processes. Defaults to the CPU count, and is never
+            more than the number of key sets
+        rate: Optional per key set request rate
+        journal: Request journal path or picklable factory (see run_worker)
+    """
+    if not user_ids:
+        raise ValueError("At least one user id (key set) is required")
+    workers = max(1, min(workers or os.cpu_count() or 1, len(user_ids)))
+
+    processes = []
+    for index in range(workers):
+        process = multiprocessing.Process(
+            target=run_worker,
+            args=(queue, job, env, user_ids[index::workers], f"{socket.gethostname()}:{os.getpid()}:{index}",
+                  config_path, rate, journal, enable_key_rotation),
+            name=f"job_worker_{index}",
+        )
+        process.start()
+        processes.append(process)
+
+    for process in processes:
+        process.join()
+
+    job_queue = _open_queue(queue)
+    try:
+        return job_queue.summary(job)
+    finally:
+        job_queue.close()
+
+
+def _read_payloads(path: str) -> Iterable[Dict[str, Any]]:
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main() -> None:
+    """Enqueue, run, work on or summarize a sharded job"""
+    parser = argparse.ArgumentParser(description="Sharded job runner for fleet-wide Bitso tasks")
+    parser.add_argument("--queue", default="jobs.db", help="Job queue database path")
+    parser.add_argument("--config", help="Path to config file")
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    enqueue = subparsers.add_parser("enqueue", help="Add tasks to a job")
+    enqueue.add_argument("--job", required=True)
+    enqueue.add_argument("--task", required=True, choices=sorted(TASKS))
+    source = enqueue.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="JSON lines file with one task payload each")
+    source.add_argument("--users", metavar="ENV", help="One task per user id in ENV's credentials")
+    enqueue.add_argument("--payload", default="{}", help="JSON merged into every --users payload")
+
+    for action in ("run", "work"):
+        worker = subparsers.add_parser(action, help="Run workers on this node" if action == "run" else "Run a single worker on this node")
+        worker.add_argument("--job", required=True)
+        worker.add_argument("--env", required=True)
+        if action == "run":
+            worker.add_argument("--user-ids", help="Comma separated key sets (defaults to every credential)")
+            worker.add_argument("--workers", type=int, help="Worker processes; key sets are shared round-robin (defaults to CPU count)")
+        else:
+            worker.add_argument("--user-id", required=True, help="Comma separated key sets used by this worker")
+        worker.add_argument("--rate", type=float, help="Maximum requests per second per key set")
+        worker.add_argument("--journal", help="Request journal database on a local disk (defaults to <queue>.journal)")
+        worker.add_argument("--key-rotation", action="store_true")
+
+    summary = subparsers.add_parser("summary", help="Show aggregated job progress")
+    summary.add_argument("--job", required=True)
+    summary.add_argument("--results", action="store_true", help="Also print every finished task as JSON lines")
+
+    args = parser.parse_args()
+
+    if args.action == "enqueue":
+        if args.input:
+            payloads = _read_payloads(args.input)
+        else:
+            extra = json.loads(args.payload)
+            payloads = ({**extra, "user_id": user_id} for user_id in credential_user_ids(args.users, args.config))
+        print(f"Enqueued {JobQueue(args.queue).enqueue(args.job, args.task, payloads)} tasks")
+
+    elif args.action == "run":
+        user_ids = args.user_ids.split(",") if args.user_ids else credential_user_ids(args.env, args.config)
+        print(json.dumps(run_local(args.queue, args.job, args.env, user_ids, args.workers, args.config,
+                                   args.rate, args.journal, args.key_rotation), indent=2))
+
+    elif args.action == "work":
+        run_worker(args.queue, args.job, args.env, args.user_id.split(","), config_path=args.config, rate=args.rate,
+                   journal=args.journal, enable_key_rotation=args.key_rotation)
+
+    else:
+        queue = JobQueue(args.queue)
+        print(json.dumps(queue.summary(args.job), indent=2))
+        if args.results:
+            for task in queue.results(args.job):
+                print(json.dumps(task, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+from decimal import ROUND_DOWN, ROUND_HALF_EVEN, Decimal, InvalidOperation, localcontext
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+# Exact money handling (Decimal amounts with per-currency precision) and a NumPy
+# batch path that evaluates thousands of quotes as fixed-point int64 columns
+
+# Used when the catalogues do not list a currency
+DEFAULT_PRECISIONS = {
+    "mxn": 2,
+    "usd": 2,
+    "ars": 2,
+    "brl": 2,
+    "cop": 2,
+    "btc": 8,
+    "eth": 8,
+    "xrp": 6,
+    "usdt": 6,
+    "usdc": 6,
+}
+DEFAULT_PRECISION = 8
+
+# Digits an int64 fixed-point value can hold without overflowing
+MAX_FIXED_POINT_DIGITS = 18
+
+# Significant digits for fee math: an 18-digit amount times a rate, before rounding
+FEE_PRECISION = 40
+
+AmountValue = Union[Decimal, int, str]
+
+
+def _to_decimal(value: AmountValue) -> Decimal:
+    """Convert an API amount to Decimal, refusing floats so no binary rounding sneaks in"""
+    if isinstance(value, float):
+        raise TypeError("Amounts do not accept floats; pass a string or Decimal")
+    if isinstance(value, Amount):
+        return value.value
+    try:
+        decimal_value = value if isinstance(value, Decimal) else Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount '{value}'")
+    if not decimal_value.is_finite():
+        raise ValueError(f"Invalid amount '{value}'")
+    return decimal_value
+
+
+class CurrencyPrecisions:
+    """Number of decimal places each currency is expressed in"""
+
+    def __init__(self, precisions: Optional[Mapping[str, int]] = None):
+        self._precisions = dict(DEFAULT_PRECISIONS)
+        if precisions:
+            self._precisions.update({currency.lower(): int(places) for currency, places in precisions.items()})
+
+    @classmethod
+    def from_catalogues(cls, catalogues: Any) -> "CurrencyPrecisions":
+        """
+        Build precisions from a catalogues payload
+
+        Any dict in the payload that names a currency ('currency', 'code' or 'symbol')
+        and its decimal places ('precision', 'decimals' or 'decimal_places') is used.
+        """
+        precisions: Dict[str, int] = {}
+
+        def visit(node: Any):
+            if isinstance(node, list):
+                for item in node:
+                    visit(item)
+            elif isinstance(node, dict):
+                currency = node.get("currency") or node.get("code") or node.get("symbol")
+                places = next((node[key] for key in ("precision", "decimals", "decimal_places") if key in node), None)
+                if isinstance(currency, str) and places is not None:
+                    try:
+                        precisions[currency.lower()] = int(places)
+                    except (TypeError, ValueError):
+                        pass
+                for value in node.values():
+                    if isinstance(value, (dict, list)):
+                        visit(value)
+
+        visit(catalogues)
+        return cls(precisions)
+
+    @classmethod
+    def fetch(cls, client) -> "CurrencyPrecisions":
+        """Load precisions from the catalogues endpoint"""
+        import public.public_api as public_api
+        return cls.from_catalogues(public_api.get_catalogues(client))
+
+    def precision(self, currency: str) -> int:
+        """Decimal places of a currency"""
+        return self._precisions.get(currency.lower(), DEFAULT_PRECISION)
+
+    def quantum(self, currency: str) -> Decimal:
+        """Smallest representable unit of a currency (e.g. Decimal('0.01') for mxn)"""
+        return Decimal(1).scaleb(-self.precision(currency))
+
+
+class Amount:
+    """An exact decimal amount of a currency. Floats are rejected to keep arithmetic exact"""
+
+    __slots__ = ("value", "currency")
+
+    def __init__(self, value: AmountValue, currency: str):
+        """
+        Initialize Amount
+
+        Args:
+            value: Decimal, int or decimal string as returned by the API (e.g. "3919790.00")
+            currency: Currency code (e.g. 'mxn')
+
+        Raises:
+            TypeError: If value is a float
+            ValueError: If value is not a valid finite decimal
+
+        Example:
+            spend = Amount("50", "mxn")
+            conversions.create_quote(client, spend, "", "mxn", "btc")
+        """
+        self.value = _to_decimal(value)
+        self.currency = currency.lower()
+
+    def _check_currency(self, other: "Amount"):
+        if not isinstance(other, Amount):
+            raise TypeError(f"Expected Amount, got {type(other).__name__}")
+        if other.currency != self.currency:
+            raise ValueError(f"Currency mismatch: {self.currency} and {other.currency}")
+
+    def __add__(self, other: "Amount") -> "Amount":
+        self._check_currency(other)
+        return Amount(self.value + other.value, self.currency)
+
+    def __sub__(self, other: "Amount") -> "Amount":
+        self._check_currency(other)
+        return Amount(self.value - other.value, self.currency)
+
+    def __mul__(self, factor: AmountValue) -> "Amount":
+        return Amount(self.value * _to_decimal(factor), self.currency)
+
+    __rmul__ = __mul__
+
+    def __neg__(self) -> "Amount":
+        return Amount(-self.value, self.currency)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Amount) and self.currency == other.currency and self.value == other.value
+
+    def __lt__(self, other: "Amount") -> bool:
+        self._check_currency(other)
+        return self.value < other.value
+
+    def __le__(self, other: "Amount") -> bool:
+        self._check_currency(other)
+        return self.value <= other.value
+
+    def __hash__(self) -> int:
+        return hash((self.value, self.currency))
+
+    def __str__(self) -> str:
+        """Plain decimal string suitable for API payloads and query strings"""
+        return format(self.value, "f")
+
+    def __repr__(self) -> str:
+        return f"Amount('{self}', '{self.currency}')"
+
+    def rounded(self, precisions: Optional[CurrencyPrecisions] = None, rounding: str = ROUND_DOWN) -> "Amount":
+        """Round to the currency precision (truncating by default, so spending never exceeds the amount)"""
+        precisions = precisions or CurrencyPrecisions()
+        return Amount(self.value.quantize(precisions.quantum(self.currency), rounding=rounding), self.currency)
+
+    def convert(self, rate: AmountValue, currency: str) -> "Amount":
+        """Convert at a rate expressed as units of `currency` per unit of this amount's currency"""
+        return Amount(self.value * _to_decimal(rate), currency)
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("numpy is required for batch quote math. Install it with 'pip install numpy'")
+
+
+def to_fixed_point(values: Iterable[Any], scale: Union[int, Sequence[int]]):
+    """
+    Parse decimal strings into an int64 array of values multiplied by 10**scale, exactly
+
+    `scale` is either one number of decimal places for every value or one per value
+    (e.g. the precision of each row's currency). Parsing uses NumPy string operations,
+    so no Decimal is created per value.
+
+    Raises:
+        ValueError: If a value is not a plain ASCII decimal or has more decimals than its scale
+        OverflowError: If a value does not fit in int64 at its scale
+    """
+    _require_numpy()
+    strings = np.char.strip(np.asarray(list(values), dtype=str))
+    try:
+        # isdigit also accepts non-ASCII digits (e.g. Arabic-Indic), which are not amounts
+        strings.astype(np.bytes_)
+    except UnicodeEncodeError:
+        raise ValueError("Values must be plain ASCII decimal strings (e.g. '3919790.00')")
+
+    scales = np.broadcast_to(np.asarray(scale, dtype=np.int64), strings.shape)
+    fixed = np.zeros(strings.shape, dtype=np.int64)
+    for row_scale in np.unique(scales):
+        rows = scales == row_scale
+        fixed[rows] = _parse_fixed_point(strings[rows], int(row_scale))
+    return fixed
+
+
+def _parse_fixed_point(strings, scale: int):
+    """Parse stripped ASCII decimal strings that all share one scale"""
+    negative = np.char.startswith(strings, "-")
+    unsigned = np.char.lstrip(strings, "+-")
+    if np.any(np.char.str_len(strings) - np.char.str_len(unsigned) > 1):
+        raise ValueError("Values must be plain decimal strings (e.g. '3919790.00')")
+    parts = np.char.partition(unsigned, ".")
+    integer_part, fraction_part = parts[..., 0], parts[..., 2]
+
+    # Every value needs at least one digit: '', '-', '+' and '.' are not amounts
+    all_digits = np.char.add(integer_part, fraction_part)
+    if not np.all(np.char.isdigit(all_digits)):
+        raise ValueError("Values must be plain decimal strings (e.g. '3919790.00')")
+    if np.any(np.char.str_len(fraction_part) > scale):
+        raise ValueError(f"Value with more than {scale} decimal places cannot be represented exactly")
+
+    digits = np.char.add(integer_part, np.char.ljust(fraction_part, scale, "0"))
+    digits = np.char.lstrip(digits, "0")
+    digits = np.where(np.char.str_len(digits) == 0, "0", digits)
+    if np.any(np.char.str_len(digits) > MAX_FIXED_POINT_DIGITS):
+        raise OverflowError(f"Value does not fit in a 64-bit fixed-point number with {scale} decimal places")
+
+    fixed = digits.astype(np.int64)
+    return np.where(negative, -fixed, fixed)
+
+
+def from_fixed_point(value: int, scale: int) -> Decimal:
+    """Convert one fixed-point integer back to an exact Decimal"""
+    return Decimal(int(value)).scaleb(-scale)
+
+
+class QuoteBatch:
+    """Column-oriented view of many conversion quotes for vectorized rate, fee and slippage math"""
+
+    def __init__(self, quotes: Sequence[Dict[str, Any]], precisions: Optional[CurrencyPrecisions] = None):
+        """
+        Initialize QuoteBatch
+
+        Amounts are held as exact int64 fixed-point columns, each row scaled by its
+        own currency's precision (from_scale/to_scale), so one high-precision currency
+        does not affect the other rows. Ratios (rates, slippage) are float64 approximations.
+
+        Args:
+            quotes: Quote payloads with from_amount, from_currency, to_amount, to_currency
+                and optionally rate/plain_rate/rate_currency
+            precisions: Currency precisions (e.g. CurrencyPrecisions.fetch(client))
+
+        Raises:
+            ImportError: If numpy is not installed
+            KeyError: If a quote is missing a required field
+        """
+        _require_numpy()
+        self._precisions = precisions or CurrencyPrecisions()
+        self.size = len(quotes)
+
+        self.from_currency = np.array([quote["from_currency"].lower() for quote in quotes], dtype=str)
+        self.to_currency = np.array([quote["to_currency"].lower() for quote in quotes], dtype=str)
+        self.from_scale = self._row_scales(self.from_currency)
+        self.to_scale = self._row_scales(self.to_currency)
+        self.from_amount = to_fixed_point([quote["from_amount"] for quote in quotes], self.from_scale)
+        self.to_amount = to_fixed_point([quote["to_amount"] for quote in quotes], self.to_scale)
+
+        rate_currency = np.array([str(quote.get("rate_currency", "")).lower() for quote in quotes], dtype=str)
+        self._invert_rate = rate_currency == self.from_currency
+        self.quoted_rate = self._rate_column(quotes, "rate")
+        self.plain_rate = self._rate_column(quotes, "plain_rate")
+        self._plain_rates = [quote.get("plain_rate") for quote in quotes]
+
+    def _row_scales(self, currencies):
+        """Precision of each row's currency"""
+        names, rows = np.unique(currencies, return_inverse=True)
+        scales = np.array([self._precisions.precision(str(name)) for name in names], dtype=np.int64)
+        return scales[rows].reshape(currencies.shape)
+
+    def _rate_column(self, quotes: Sequence[Dict[str, Any]], field: str):
+        """Rates normalized to units of to_currency per unit of from_currency (NaN if absent)"""
+        rates = np.array([quote.get(field) or "nan" for quote in quotes], dtype=np.float64)
+        with np.errstate(divide="ignore"):
+            return np.where(self._invert_rate, 1.0 / rates, rates)
+
+    def _as_float(self, fixed, scale):
+        return fixed.astype(np.float64) / np.power(10.0, scale)
+
+    def effective_rates(self):
+        """Received units per spent unit for every quote"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self._as_float(self.to_amount, self.to_scale) / self._as_float(self.from_amount, self.from_scale)
+
+    def fees(self) -> List[Optional[Amount]]:
+        """
+        Exact implied fee/spread per quote as a to_currency Amount: what the plain (no
+        spread) rate would have paid, rounded to the to_currency precision, minus what
+        the quote pays. None where plain_rate is absent or zero
+        """
+        fees: List[Optional[Amount]] = []
+        with localcontext() as context:
+            context.prec = FEE_PRECISION
+            for index, plain_rate in enumerate(self._plain_rates):
+                rate = _to_decimal(plain_rate) if plain_rate not in (None, "") else Decimal(0)
+                if rate == 0:
+                    fees.append(None)
+                    continue
+                if self._invert_rate[index]:
+                    rate = 1 / rate
+                spent, received = self.amounts(index)
+                expected = spent.convert(rate, received.currency).rounded(self._precisions, ROUND_HALF_EVEN)
+                fees.append(expected - received)
+        return fees
+
+    def slippage_bps(self, reference_rates: Union[Mapping[Tuple[str, str], Any], Any, None] = None):
+        """
+        Slippage of each effective rate against a reference rate, in basis points
+
+        Args:
+            reference_rates: Per-pair mapping {(from_currency, to_currency): rate}, an
+                array with one rate per quote, or None to compare against the quoted rate.
+                Positive values mean the quote pays more than the reference
+        """
+        if reference_rates is None:
+            reference = self.quoted_rate
+        elif isinstance(reference_rates, Mapping):
+            lookup = {(source.lower(), target.lower()): float(rate) for (source, target), rate in reference_rates.items()}
+            reference = np.array(
+                [lookup.get(pair, np.nan) for pair in zip(self.from_currency.tolist(), self.to_currency.tolist())],
+                dtype=np.float64,
+            )
+        else:
+            reference = np.asarray(reference_rates, dtype=np.float64)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (self.effective_rates() - reference) / reference * 10000.0
+
+    def totals(self) -> Dict[str, Dict[str, Amount]]:
+        """Exact spent and received totals per currency"""
+        return {
+            "spent": self._sum_by_currency(self.from_amount, self.from_currency),
+            "received": self._sum_by_currency(self.to_amount, self.to_currency),
+        }
+
+    def _sum_by_currency(self, amounts, currencies) -> Dict[str, Amount]:
+        names, groups = np.unique(currencies, return_inverse=True)
+        # int64 sums wrap silently; fall back to Python ints when they could overflow
+        if np.abs(amounts.astype(np.float64)).sum() < 2.0 ** 62:
+            sums = np.zeros(len(names), dtype=np.int64)
+            np.add.at(sums, groups, amounts)
+        else:
+            sums = np.zeros(len(names), dtype=object)
+            np.add.at(sums, groups, amounts.astype(object))
+        # Rows of one currency all share its precision
+        return {
+            str(name): Amount(from_fixed_point(total, self._precisions.precision(str(name))), str(name))
+            for name, total in zip(names, sums)
+        }
+
+    def amounts(self, index: int) -> Tuple[Amount, Amount]:
+        """Exact (spent, received) amounts of a single quote"""
+        return (
+            Amount(from_fixed_point(self.from_amount[index], int(self.from_scale[index])), str(self.from_currency[index])),
+            Amount(from_fixed_point(self.to_amount[index], int(self.to_scale[index])), str(self.to_currency[index])),
+        )
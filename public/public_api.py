@@ -1,4 +1,6 @@
 import http_utils
+import time
+import uuid
 from bitso_client import BitsoClient
 
 # https://bitso.com/api_info#place-an-order
@@ -29,13 +31,50 @@ def place_order(url, key, secret,
     response = http_utils.post(url, request_path, key, secret, payload)
     print(response.content)
 
+# https://bitso.com/api_info#place-an-order
+def create_order(client: BitsoClient, book, side, type, major = "", minor = "", rate = "", origin_id = ""):
+    """
+    Place an order through the client, journaled by origin_id so a retry never places it twice
+
+    Returns:
+        dict: The payload data from successful response (contains the oid)
+    """
+    request_path = "/api/v3/orders"
+    payload = {
+        'book':book,
+        'side':side,
+        'type':type,
+    }
+
+    if major:
+        payload['major'] = major
+
+    if minor:
+        payload['minor'] = minor
+
+    if rate:
+        payload['price'] = rate
+
+    if not origin_id:
+        # Unique default so concurrent orders never share an idempotency key
+        origin_id = uuid.uuid4().hex
+    payload['origin_id'] = origin_id
+
+    return client.post(request_path, payload, idempotency_key=f"order:{origin_id}")
+
 # https://bitso.com/api_info#account-status
 def account_status(client: BitsoClient):
     request_path = "/api/v3/account_status"
     response = client.get(request_path)
-    print(response.content)
+    print(response)
+    return response
 
 def catalogues(url, key, secret):
     request_path = "/api/v3/catalogues"
     response = http_utils.get(url, request_path, key, secret)
     print(response.content)
+
+def get_catalogues(client: BitsoClient):
+    """Get the catalogues payload (currencies, precisions, books) through the client"""
+    request_path = "/api/v3/catalogues"
+    return client.get(request_path)
@@ -0,0 +1,231 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+# Append-only journal of mutating API calls (POST/PUT), backed by a SQLite write-ahead log
+
+PENDING = "pending"
+COMPLETED = "completed"
+FAILED = "failed"
+UNKNOWN = "unknown"  # Request may or may not have been executed (e.g. timeout with no status found)
+
+UNRESOLVED_STATES = (PENDING, UNKNOWN)
+
+
+class RequestJournal:
+    """Durable, append-only record of the intent and outcome of each mutating request"""
+
+    def __init__(self, path: str = "request_journal.db", claim_timeout: float = 300.0):
+        """
+        Open (or create) a request journal
+
+        Every state change is appended as a new row and synced to disk before the
+        request is sent, so a restarted worker can find calls whose outcome was
+        never recorded and reconcile them instead of executing them twice.
+
+        Args:
+            path: SQLite database file path
+            claim_timeout: Seconds after which a key claimed by a caller that never
+                released it (e.g. a crashed worker) can be claimed again
+
+        Example:
+            journal = RequestJournal('stage_journal.db')
+            client = BitsoClient('stage', '28', journal=journal)
+        """
+        self._path = path
+        self._claim_timeout = claim_timeout
+        self._owner = f"{os.getpid()}:{uuid.uuid4().hex}"
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=FULL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS journal_events (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                idempotency_key TEXT NOT NULL,
+                method TEXT NOT NULL,
+                path TEXT NOT NULL,
+                payload TEXT,
+                state TEXT NOT NULL,
+                response TEXT,
+                error TEXT,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS journal_events_key ON journal_events (idempotency_key, seq)"
+        )
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS journal_claims (
+                idempotency_key TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                claimed_at REAL NOT NULL
+            )
+            """
+        )
+
+    def _append(
+        self,
+        idempotency_key: str,
+        method: str,
+        path: str,
+        payload: Optional[Dict[str, Any]],
+        state: str,
+        response: Any = None,
+        error: Optional[str] = None,
+    ):
+        with self._lock:
+            self._connection.execute(
+                """
+                INSERT INTO journal_events
+                    (idempotency_key, method, path, payload, state, response, error, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    idempotency_key,
+                    method,
+                    path,
+                    json.dumps(payload) if payload is not None else None,
+                    state,
+                    json.dumps(response) if response is not None else None,
+                    error,
+                    time.time(),
+                ),
+            )
+
+    @staticmethod
+    def _to_entry(row: sqlite3.Row) -> Dict[str, Any]:
+        entry = dict(row)
+        entry["payload"] = json.loads(entry["payload"]) if entry["payload"] else None
+        entry["response"] = json.loads(entry["response"]) if entry["response"] else None
+        return entry
+
+    def record_intent(self, idempotency_key: str, method: str, path: str, payload: Optional[Dict[str, Any]] = None):
+        """Record that a request is about to be sent"""
+        self._append(idempotency_key, method, path, payload, PENDING)
+
+    def record_outcome(self, entry: Dict[str, Any], state: str, response: Any = None, error: Optional[str] = None):
+        """Record the final (or unknown) outcome of a previously journaled request"""
+        self._append(entry["idempotency_key"], entry["method"], entry["path"], entry["payload"], state, response, error)
+
+    def _try_claim(self, idempotency_key: str, owner: str) -> bool:
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM journal_claims WHERE idempotency_key = ? AND claimed_at < ?",
+                (idempotency_key, now - self._claim_timeout),
+            )
+            cursor = self._connection.execute(
+                "INSERT OR IGNORE INTO journal_claims (idempotency_key, owner, claimed_at) VALUES (?, ?, ?)",
+                (idempotency_key, owner, now),
+            )
+        return cursor.rowcount == 1
+
+    @contextmanager
+    def claim(self, idempotency_key: str, wait_timeout: Optional[float] = None, poll_interval: float = 0.05) -> Iterator[None]:
+        """
+        Hold an exclusive claim on a key across threads and processes sharing the journal
+
+        Args:
+            idempotency_key: Key to claim
+            wait_timeout: Seconds to wait for another holder. Defaults to claim_timeout
+            poll_interval: Seconds between claim attempts
+
+        Raises:
+            TimeoutError: If the key is still claimed after wait_timeout
+        """
+        owner = f"{self._owner}:{threading.get_ident()}"
+        deadline = time.monotonic() + (self._claim_timeout if wait_timeout is None else wait_timeout)
+        while not self._try_claim(idempotency_key, owner):
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Idempotency key {idempotency_key} is claimed by another caller")
+            time.sleep(poll_interval)
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._connection.execute(
+                    "DELETE FROM journal_claims WHERE idempotency_key = ? AND owner = ?", (idempotency_key, owner)
+                )
+
+    def get(self, idempotency_key: str) -> Optional[Dict[str, Any]]:
+        """Get the latest journal entry for an idempotency key, or None if never seen"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT * FROM journal_events WHERE idempotency_key = ? ORDER BY seq DESC LIMIT 1",
+                (idempotency_key,),
+            ).fetchone()
+        return self._to_entry(row) if row else None
+
+    def unresolved(self) -> List[Dict[str, Any]]:
+        """Get the latest entry of every request whose outcome is pending or unknown"""
+        with self._lock:
+            rows = self._connection.execute(
+                """
+                SELECT e.* FROM journal_events e
+                JOIN (
+                    SELECT idempotency_key, MAX(seq) AS seq FROM journal_events GROUP BY idempotency_key
+                ) latest ON latest.seq = e.seq
+                WHERE e.state IN (?, ?)
+                ORDER BY e.seq
+                """,
+                UNRESOLVED_STATES,
+            ).fetchall()
+        return [self._to_entry(row) for row in rows]
+
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self._connection.close()
+
+
+def _is_order_creation(entry: Dict[str, Any]) -> bool:
+    path = entry["path"].split("?")[0].rstrip("/")
+    return entry["method"] == "POST" and path == "/api/v3/orders" and bool((entry["payload"] or {}).get("origin_id"))
+
+
+def _is_conversion_execution(entry: Dict[str, Any]) -> bool:
+    path = entry["path"].split("?")[0].rstrip("/")
+    return entry["method"] == "PUT" and path.startswith("/api/v4/currency_conversions/")
+
+
+def has_status_lookup(entry: Dict[str, Any]) -> bool:
+    """Whether lookup_status knows how to reconcile this journal entry"""
+    return _is_order_creation(entry) or _is_conversion_execution(entry)
+
+
+def lookup_status(client, entry: Dict[str, Any]) -> Optional[Any]:
+    """
+    Default status lookup used to reconcile a journaled request
+
+    Args:
+        client: BitsoClient instance
+        entry: Journal entry of the request to reconcile
+
+    Returns:
+        The executed resource if the request took effect, None if it did not (or
+        if the endpoint has no known status lookup)
+    """
+    # Orders are looked up by the client supplied origin_id
+    if _is_order_creation(entry):
+        orders = client.get(f"/api/v3/orders?origin_ids={entry['payload']['origin_id']}")
+        return orders[0] if orders else None
+
+    # Conversions are looked up by quote id; an 'open' quote was never executed
+    if _is_conversion_execution(entry):
+        conversion = client.get(entry["path"])
+        if conversion and conversion.get("status") not in (None, "open"):
+            return conversion
+        return None
+
+    return None
@@ -1,12 +1,12 @@
-import public.public_api as public
-import internal.internal_api as internal
-import internal.conversions_api as conversions
-import internal.onboarding as onboarding
-from bitso_client import BitsoClient
 import time
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-def placing_multiple_conversions(client: BitsoClient, required_conversions: int) -> None:
+# API modules (and requests with them) are imported inside the functions that use
+# them, so importing this module or running a single operation stays cheap
+if TYPE_CHECKING:
+    from bitso_client import BitsoClient
+
+def placing_multiple_conversions(client: "BitsoClient", required_conversions: int) -> None:
     """
     Place multiple conversions
     
@@ -21,7 +21,7 @@ def placing_multiple_conversions(client: BitsoClient, required_conversions: int)
         time.sleep(1)
     print("Multiple conversion completed")
 
-def conversion_execution(client: BitsoClient) -> None:
+def conversion_execution(client: "BitsoClient") -> None:
     """
     Execute a single conversion
     
@@ -50,6 +50,9 @@ def conversion_execution(client: BitsoClient) -> None:
 
 def main() -> None:
     """Main execution function"""
+    from bitso_client import BitsoClient
+    import internal.onboarding as onboarding
+
     try:
         # Create BitsoClient instance
         client = BitsoClient(
@@ -62,7 +65,7 @@ def main() -> None:
         #public.account_status(client)
         onboarding.Onboarding.testing_terms_migration(client)
         
-        # Commented examples
+        # Commented examples (import public.public_api as public, internal.internal_api as internal first)
         """
         # Public API calls
         public.catalogues(client)
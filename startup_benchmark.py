@@ -0,0 +1,152 @@
+import argparse
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Dict, List, Tuple
+
+# Cold-start benchmark: import time of the client modules and time-to-first-request
+# of a fresh process against a local stub server
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+FIRST_REQUEST_SCRIPT = """
+import time
+start = time.perf_counter()
+from bitso_client import BitsoClient
+import internal.internal_api as internal_api
+client = BitsoClient("bench", "bench", config_path={config_path!r})
+internal_api.get_terms(client)
+print(time.perf_counter() - start)
+"""
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Answers every request with an empty successful payload"""
+
+    def _respond(self):
+        body = json.dumps({"success": True, "payload": []}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _respond
+    do_POST = _respond
+    do_PUT = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int]]:
+    """Parse `-X importtime` output into (module, cumulative microseconds) pairs"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Top-level imports are not indented; nested ones are indented two spaces per level
+        imports.append((name[1:].rstrip(), int(cumulative)))
+    return imports
+
+
+def measure_import_time(module: str, runs: int) -> Dict:
+    """Import `module` in fresh interpreters and report its cumulative import time"""
+    totals = []
+    slowest: List[Tuple[str, int]] = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=PROJECT_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        imports = parse_importtime(result.stderr)
+        totals.append(next(cumulative for name, cumulative in imports if name == module))
+        slowest = sorted(
+            ((name, cumulative) for name, cumulative in imports if not name.startswith(" ")),
+            key=lambda item: item[1],
+            reverse=True,
+        )[:10]
+
+    return {
+        "module": module,
+        "import_ms_median": statistics.median(totals) / 1000,
+        "import_ms_min": min(totals) / 1000,
+        "slowest_imports_ms": {name: cumulative / 1000 for name, cumulative in slowest},
+    }
+
+
+def measure_time_to_first_request(runs: int) -> Dict:
+    """Start fresh processes that build a client and make one GET to a local stub"""
+    server = HTTPServer(("127.0.0.1", 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    config = {
+        "environments": {"bench": f"http://127.0.0.1:{server.server_port}"},
+        "credentials": {"bench": {"bench": {"key": "bench", "secret": "bench"}}},
+    }
+
+    process_times = []
+    in_process_times = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_path = os.path.join(temp_dir, "config.json")
+        with open(config_path, "w") as f:
+            json.dump(config, f)
+
+        script = FIRST_REQUEST_SCRIPT.format(config_path=config_path)
+        try:
+            for _ in range(runs):
+                start = time.perf_counter()
+                result = subprocess.run(
+                    [sys.executable, "-c", script],
+                    cwd=PROJECT_DIR,
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+                process_times.append(time.perf_counter() - start)
+                in_process_times.append(float(result.stdout.strip().splitlines()[-1]))
+        finally:
+            server.shutdown()
+
+    return {
+        "process_ms_median": statistics.median(process_times) * 1000,
+        "process_ms_min": min(process_times) * 1000,
+        "in_process_ms_median": statistics.median(in_process_times) * 1000,
+    }
+
+
+def main() -> None:
+    """Run the startup benchmark and optionally append the results to a tracking file"""
+    parser = argparse.ArgumentParser(description="Measure cold-start latency of the Bitso client")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh processes per measurement")
+    parser.add_argument("--module", default="bitso_client", help="Module whose import time is measured")
+    parser.add_argument("--output", help="Append results as a JSON line to this file")
+    args = parser.parse_args()
+
+    results = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "import": measure_import_time(args.module, args.runs),
+        "first_request": measure_time_to_first_request(args.runs),
+    }
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(results) + "\n")
+
+
+if __name__ == "__main__":
+    main()